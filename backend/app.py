@@ -6,6 +6,12 @@ import pandas as pd
 import os
 import traceback
 import sys
+import time
+
+from knn_compact import CompactKNN, STORAGE_MODES, source_fingerprint
+from explain import explain_logistic, explain_kmeans
+from features import encode_telco
+from shadow import ModelVersions, parse_weights
 
 app = Flask(__name__)
 
@@ -13,23 +19,46 @@ CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:3000", "http://localhost:5000", "http://127.0.0.1:3000"],
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type", "X-Customer-ID"]
     }
 })
 
 os.makedirs('models', exist_ok=True)
 
+# almacenamiento del conjunto de referencia de KNN: float64 (sklearn), float32 o int8
+KNN_STORAGE = os.environ.get('KNN_STORAGE', 'float64')
+if KNN_STORAGE != 'float64' and KNN_STORAGE not in STORAGE_MODES:
+    print(f"[AVISO] KNN_STORAGE='{KNN_STORAGE}' no es válido "
+          f"(opciones: float64, {', '.join(STORAGE_MODES)}), se usa float64")
+    KNN_STORAGE = 'float64'
+
+def load_knn(storage):
+    """Cargar KNN en el almacenamiento pedido, usando models/knn_<storage>.pkl si está al día"""
+    knn = pickle.load(open('models/knn.pkl', 'rb'))
+    if storage == 'float64':
+        return knn
+    compact_path = f'models/knn_{storage}.pkl'
+    if os.path.exists(compact_path):
+        compact = pickle.load(open(compact_path, 'rb'))
+        # el pickle compacto solo sirve si salió del mismo models/knn.pkl
+        if getattr(compact, 'source_fingerprint_', None) == source_fingerprint(knn):
+            return compact
+        print(f"[AVISO] {compact_path} no corresponde a models/knn.pkl, se reconstruye")
+    return CompactKNN.from_estimator(knn, storage=storage)
+
 def load_models():
     models = {}
     try:
         models['lr'] = pickle.load(open('models/logistic_regression.pkl', 'rb'))
-        models['knn'] = pickle.load(open('models/knn.pkl', 'rb'))
-        models['scaler'] = pickle.load(open('models/scaler.pkl', 'rb'))
+        models['knn'] = load_knn(KNN_STORAGE)
+        # cada modelo Telco con el scaler con el que se entrenó
+        models['scaler_lr'] = pickle.load(open('models/scaler_lr.pkl', 'rb'))
+        models['scaler_knn'] = pickle.load(open('models/scaler_knn.pkl', 'rb'))
         models['encoders'] = pickle.load(open('models/label_encoders.pkl', 'rb'))
         models['kmeans'] = pickle.load(open('models/kmeans.pkl', 'rb'))
         models['scaler_kmeans'] = pickle.load(open('models/scaler_kmeans.pkl', 'rb'))
         models['cluster_profiles'] = pickle.load(open('models/cluster_profiles.pkl', 'rb'))
-        print("[OK] Todos los modelos cargados correctamente")
+        print(f"[OK] Todos los modelos cargados correctamente (KNN: {KNN_STORAGE})")
         return models
     except FileNotFoundError as e:
         print(f"[ERROR] No se encontraron los modelos: {e}")
@@ -41,6 +70,86 @@ def load_models():
 
 models = load_models()
 
+# nombres y orden de los campos tal como se entrenaron los scalers
+TELCO_FEATURES = list(models['scaler_lr'].feature_names_in_) if models else []
+KNN_FEATURES = list(models['scaler_knn'].feature_names_in_) if models else []
+CC_FEATURES = list(models['scaler_kmeans'].feature_names_in_) if models else []
+
+def knn_vote(knn, X_scaled):
+    """Un solo kneighbors: el voto de los vecinos da predicción y probabilidades"""
+    distances, indices = knn.kneighbors(X_scaled)
+    votes = knn._y[indices]
+    counts = (votes[:, :, None] == np.arange(len(knn.classes_))).sum(axis=1)
+    pred = knn.classes_[np.argmax(counts, axis=1)]
+    proba = counts / counts.sum(axis=1, keepdims=True)
+    return pred, proba, distances, indices
+
+def score_lr(lr, X_scaled):
+    pred, proba, _ = explain_logistic(lr, X_scaled, TELCO_FEATURES, explain=False)
+    return pred, proba
+
+def score_knn(knn, X_scaled):
+    pred, proba, _, _ = knn_vote(knn, X_scaled)
+    return pred, proba[:, 1]
+
+# versiones candidatas (opcionales) para evaluación shadow y ruteo A/B, p. ej.:
+#   LR_CANDIDATE=models/logistic_regression_v2.pkl SHADOW_FRACTION=0.2
+#   KNN_CANDIDATE=models/knn_v2.pkl KNN_AB_WEIGHTS=live=90,candidate=10
+SHADOW_FRACTION = float(os.environ.get('SHADOW_FRACTION', '0'))
+SHADOW_WORKERS = int(os.environ.get('SHADOW_WORKERS', '2'))
+
+def load_versions(name, live, score_fn, prepare=None):
+    """Armar las versiones live/candidata de un modelo a partir de las variables de entorno
+
+    prepare(candidata) deja la candidata en el mismo formato que live (p. ej. KNN compacto),
+    así la comparación shadow mide el modelo y no la diferencia de almacenamiento.
+    """
+    prefix = name.upper()
+    candidate = None
+    candidate_path = os.environ.get(f'{prefix}_CANDIDATE')
+    if candidate_path:
+        try:
+            candidate = pickle.load(open(candidate_path, 'rb'))
+            if prepare is not None:
+                candidate = prepare(candidate)
+            print(f"[OK] Candidata {name} cargada desde {candidate_path}")
+        except FileNotFoundError:
+            print(f"[ERROR] No se encontró la candidata {name}: {candidate_path}")
+    weights = None
+    weights_text = os.environ.get(f'{prefix}_AB_WEIGHTS')
+    try:
+        weights = parse_weights(weights_text) or None
+    except ValueError:
+        print(f"[ERROR] {prefix}_AB_WEIGHTS inválido ('{weights_text}'), se usa solo live "
+              f"(formato: live=90,candidate=10)")
+    return ModelVersions(name, live, score_fn, candidate=candidate, weights=weights,
+                         shadow_fraction=SHADOW_FRACTION, workers=SHADOW_WORKERS)
+
+def compact_like_live(knn):
+    """Candidata KNN con el mismo KNN_STORAGE que el modelo live"""
+    if KNN_STORAGE == 'float64':
+        return knn
+    return CompactKNN.from_estimator(knn, storage=KNN_STORAGE)
+
+versions = {}
+if models:
+    versions['lr'] = load_versions('lr', models['lr'], score_lr)
+    versions['knn'] = load_versions('knn', models['knn'], score_knn, prepare=compact_like_live)
+
+def routing_key(rows):
+    """Clave estable para A/B: cabecera X-Customer-ID o customerID de la primera fila"""
+    return request.headers.get('X-Customer-ID') or (rows[0].get('customerID') if rows else None)
+
+def read_rows():
+    """Leer el cuerpo como lista de filas; devuelve (filas, es_lote, explicar)"""
+    data = request.json
+    is_batch = isinstance(data, list)
+    rows = data if is_batch else [data]
+    explain = request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+    if not is_batch:
+        explain = explain or bool(data.pop('explain', False))
+    return rows, is_batch, explain
+
 @app.route('/health', methods=['GET'])
 def health():
     """Verificar que el servidor está activo"""
@@ -49,6 +158,11 @@ def health():
         'models_loaded': all(k in models for k in ['lr', 'knn', 'kmeans'])
     }), 200
 
+@app.route('/api/shadow-stats', methods=['GET'])
+def shadow_stats():
+    """Comparación de las candidatas contra los modelos live (shadow y A/B)"""
+    return jsonify({name: v.stats() for name, v in versions.items()}), 200
+
 @app.route('/api/predict-churn-lr', methods=['POST', 'OPTIONS'])
 def predict_churn_lr():
     """Predicción de Churn usando Regresión Logística"""
@@ -59,52 +173,28 @@ def predict_churn_lr():
         if 'lr' not in models or not models['lr']:
             return jsonify({'error': 'Modelos no cargados. Ejecuta los scripts de entrenamiento.'}), 500
             
-        data = request.json
+        rows, is_batch, explain = read_rows()
+        if not rows:
+            return jsonify({'predictions': []}), 200
+        version, lr = versions['lr'].route(routing_key(rows))
         
-        categorical_features = ['gender', 'SeniorCitizen', 'Partner', 'Dependents', 
-                               'PhoneService', 'MultipleLines', 'InternetService',
-                               'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                               'TechSupport', 'StreamingTV', 'StreamingMovies',
-                               'Contract', 'PaperlessBilling', 'PaymentMethod']
-        numerical_features = ['tenure', 'MonthlyCharges', 'TotalCharges']
+        X_scaled = models['scaler_lr'].transform(encode_telco(rows, models['encoders'], TELCO_FEATURES))
+        start = time.perf_counter()
+        lr_pred, lr_proba, explanations = explain_logistic(lr, X_scaled, TELCO_FEATURES, explain)
+        versions['lr'].shadow(version, X_scaled, lr_pred, lr_proba, (time.perf_counter() - start) * 1000)
         
-        encoded_data = {}
-        for col in categorical_features:
-            try:
-                le = models['encoders'][col]
-                val = data[col]
-                if val == "Masculino":
-                    val = "Male"
-                elif val == "Femenino":
-                    val = "Female"
-                elif val == "Sí":
-                    val = "Yes"
-                elif val == "No":
-                    val = "No"
-                elif val == "Mes a mes":
-                    val = "Month-to-month"
-                elif val == "Cheque electrónico":
-                    val = "Electronic check"
-                
-                encoded_data[col] = le.transform([val])[0]
-            except (KeyError, ValueError):
-                encoded_data[col] = 0
+        results = []
+        for i in range(len(rows)):
+            result = {
+                'prediction': 1 if lr_pred[i] == 1 else 0,
+                'probability': float(lr_proba[i]),
+                'model_version': version
+            }
+            if explain:
+                result['explanation'] = explanations[i]
+            results.append(result)
         
-        for col in numerical_features:
-            encoded_data[col] = float(data.get(col, 0))
-        
-        feature_order = categorical_features + numerical_features
-        X_input = np.array([[encoded_data[col] for col in feature_order]])
-        
-        X_scaled = models['scaler'].transform(X_input)
-        
-        lr_pred = models['lr'].predict(X_scaled)[0]
-        lr_proba = models['lr'].predict_proba(X_scaled)[0]
-        
-        return jsonify({
-            'prediction': 1 if lr_pred == 1 else 0,
-            'probability': float(lr_proba[1])
-        }), 200
+        return jsonify({'predictions': results} if is_batch else results[0]), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': str(e)}), 400
@@ -120,48 +210,21 @@ def predict_churn_knn():
             return jsonify({'error': 'Modelos no cargados. Ejecuta los scripts de entrenamiento.'}), 500
             
         data = request.json
+        version, knn = versions['knn'].route(routing_key([data]))
         
-        categorical_features = ['gender', 'SeniorCitizen', 'Partner', 'Dependents', 
-                               'PhoneService', 'MultipleLines', 'InternetService',
-                               'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                               'TechSupport', 'StreamingTV', 'StreamingMovies',
-                               'Contract', 'PaperlessBilling', 'PaymentMethod']
-        numerical_features = ['tenure', 'MonthlyCharges', 'TotalCharges']
-        
-        encoded_data = {}
-        for col in categorical_features:
-            try:
-                le = models['encoders'][col]
-                val = data[col]
-                if val == "Masculino":
-                    val = "Male"
-                elif val == "Femenino":
-                    val = "Female"
-                elif val == "Sí":
-                    val = "Yes"
-                elif val == "No":
-                    val = "No"
-                elif val == "Mes a mes":
-                    val = "Month-to-month"
-                elif val == "Cheque electrónico":
-                    val = "Electronic check"
-                
-                encoded_data[col] = le.transform([val])[0]
-            except (KeyError, ValueError):
-                encoded_data[col] = 0
-        
-        for col in numerical_features:
-            encoded_data[col] = float(data.get(col, 0))
-        
-        feature_order = categorical_features + numerical_features
-        X_input = np.array([[encoded_data[col] for col in feature_order]])
-        
-        X_scaled = models['scaler'].transform(X_input)
-        
-        knn_pred = models['knn'].predict(X_scaled)[0]
+        X_scaled = models['scaler_knn'].transform(encode_telco([data], models['encoders'], KNN_FEATURES))
+        start = time.perf_counter()
+        knn_pred, knn_proba, distances, indices = knn_vote(knn, X_scaled)
+        versions['knn'].shadow(version, X_scaled, knn_pred, knn_proba[:, 1], (time.perf_counter() - start) * 1000)
         
         return jsonify({
-            'prediction': 1 if knn_pred == 1 else 0
+            'prediction': 1 if knn_pred[0] == 1 else 0,
+            'probability': float(knn_proba[0, 1]),
+            'neighbors': [
+                {'index': int(i), 'class': int(knn.classes_[knn._y[i]]), 'distance': float(d)}
+                for i, d in zip(indices[0], distances[0])
+            ],
+            'model_version': version
         }), 200
     except Exception as e:
         traceback.print_exc()
@@ -177,29 +240,27 @@ def predict_cluster():
         if 'kmeans' not in models or not models['kmeans']:
             return jsonify({'error': 'Modelos no cargados. Ejecuta los scripts de entrenamiento.'}), 500
             
-        data = request.json
-        
-        features = ['BALANCE', 'BALANCE_FREQUENCY', 'PURCHASES', 'ONEOFF_PURCHASES',
-                   'INSTALLMENTS_PURCHASES', 'CASH_ADVANCE', 'PURCHASES_FREQUENCY',
-                   'ONEOFF_PURCHASES_FREQUENCY', 'PURCHASES_INSTALLMENTS_FREQUENCY',
-                   'CASH_ADVANCE_FREQUENCY', 'CASH_ADVANCE_TRX', 'PURCHASES_TRX',
-                   'CREDIT_LIMIT', 'PAYMENTS', 'MINIMUM_PAYMENTS', 'PRC_FULL_PAYMENT', 'TENURE']
-        
-        X_input = np.array([[float(data.get(col, 0)) for col in features]])
+        rows, is_batch, explain = read_rows()
+        if not rows:
+            return jsonify({'predictions': []}), 200
+        X_input = np.array([[float(row.get(col, 0)) for col in CC_FEATURES] for row in rows])
         
         X_scaled = models['scaler_kmeans'].transform(X_input)
         
-        cluster_pred = models['kmeans'].predict(X_scaled)[0]
-        
         profiles = models['cluster_profiles']
-        profile_mean = profiles[cluster_pred]
+        clusters, explanations = explain_kmeans(models['kmeans'], X_scaled, X_input, profiles, CC_FEATURES, explain)
         
-        description = generate_cluster_description(cluster_pred, profile_mean)
+        results = []
+        for i, cluster_pred in enumerate(clusters):
+            result = {
+                'cluster': int(cluster_pred),
+                'profile_description': generate_cluster_description(cluster_pred, profiles[cluster_pred])
+            }
+            if explain:
+                result['explanation'] = explanations[i]
+            results.append(result)
         
-        return jsonify({
-            'cluster': int(cluster_pred),
-            'profile_description': description
-        }), 200
+        return jsonify({'predictions': results} if is_batch else results[0]), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': str(e)}), 400
@@ -0,0 +1,62 @@
+# explicaciones por predicción para regresión logística y k-means
+# se calculan en la misma pasada vectorizada que la predicción, para una
+# fila o para un lote, así que casi no agregan latencia
+
+import numpy as np
+
+TOP_FEATURES = 5
+
+
+def _clean(value):
+    """NaN -> None para que el JSON sea válido"""
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def explain_logistic(lr, X_scaled, feature_names, explain=True):
+    """Predicción, probabilidad y contribución (valor escalado × coeficiente) por campo
+
+    Con explain=False solo se devuelven predicción y probabilidad (igual que predict_proba).
+    """
+    contributions = X_scaled * lr.coef_[0]
+    logit = contributions.sum(axis=1) + lr.intercept_[0]
+    proba = 1 / (1 + np.exp(-logit))
+    pred = lr.classes_[(logit > 0).astype(int)]
+    if not explain:
+        return pred, proba, None
+
+    explanations = []
+    for row in contributions:
+        top = np.argsort(-np.abs(row))[:TOP_FEATURES]
+        explanations.append({
+            'intercept': float(lr.intercept_[0]),
+            'contributions': {name: float(c) for name, c in zip(feature_names, row)},
+            'top_features': [feature_names[j] for j in top],
+        })
+    return pred, proba, explanations
+
+
+def explain_kmeans(kmeans, X_scaled, X_input, profiles, feature_names, explain=True):
+    """Cluster asignado, distancia a cada centroide y diferencias contra el perfil del cluster"""
+    centers = kmeans.cluster_centers_
+    d2 = ((X_scaled ** 2).sum(axis=1)[:, None] - 2 * X_scaled @ centers.T
+          + (centers ** 2).sum(axis=1)[None, :])
+    distances = np.sqrt(np.maximum(d2, 0))
+    clusters = np.argmin(distances, axis=1)
+    if not explain:
+        return clusters, None
+
+    # perfiles (media por cluster en unidades originales) como matriz alineada a los campos
+    profile_matrix = np.array([
+        np.asarray(profiles[c].reindex(feature_names), dtype=float) for c in range(len(centers))
+    ])
+    deltas = X_input - profile_matrix[clusters]
+
+    explanations = []
+    for i, cluster in enumerate(clusters):
+        explanations.append({
+            'distances': {int(c): float(d) for c, d in enumerate(distances[i])},
+            'profile': {name: _clean(v) for name, v in zip(feature_names, profile_matrix[cluster])},
+            'deltas': {name: _clean(v) for name, v in zip(feature_names, deltas[i])},
+        })
+    return clusters, explanations
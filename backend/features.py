@@ -0,0 +1,45 @@
+# codificación de las filas JSON que llegan al backend a matrices numéricas
+# los nombres y el orden de las columnas los pasa quien llama (feature_names_in_
+# del scaler entrenado), así quedan alineados con los coeficientes del modelo.
+# no carga ningún modelo al importarse, se puede usar desde scripts y benchmarks.
+
+import numpy as np
+
+# valores en español que manda el frontend
+TRANSLATIONS = {
+    "Masculino": "Male",
+    "Femenino": "Female",
+    "Sí": "Yes",
+    "Mes a mes": "Month-to-month",
+    "Cheque electrónico": "Electronic check",
+}
+
+
+# columnas binarias sin label encoder (SeniorCitizen) que el frontend manda como Sí/No
+YES_NO = {"Yes": 1.0, "No": 0.0}
+
+
+def _number(value):
+    """Valor numérico del campo; un valor que no es número hace fallar la petición (400)"""
+    value = TRANSLATIONS.get(value, value)
+    return YES_NO[value] if value in YES_NO else float(value)
+
+
+def encode_telco(rows, encoders, feature_names):
+    """Codificar filas Telco en el orden de feature_names
+
+    Las columnas con label encoder se codifican por columna de forma vectorizada
+    (valores desconocidos -> 0); el resto se toma como numérico (si falta, 0).
+    """
+    X_input = np.zeros((len(rows), len(feature_names)))
+    for j, col in enumerate(feature_names):
+        le = encoders.get(col)
+        if le is None:
+            X_input[:, j] = [_number(row.get(col, 0)) for row in rows]
+            continue
+        values = np.array([TRANSLATIONS.get(row.get(col), row.get(col)) for row in rows], dtype=object)
+        known = np.isin(values, le.classes_)
+        if known.any():
+            X_input[known, j] = le.transform(values[known])
+    return X_input
+
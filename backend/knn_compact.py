@@ -0,0 +1,192 @@
+# almacenamiento compacto del conjunto de referencia de KNN
+# el KNeighborsClassifier de sklearn guarda todo el train escalado en float64,
+# aquí lo guardamos en float32 o int8 (con escala por columna) y empaquetamos
+# las columnas categóricas de pocos niveles en campos de bits.
+# las distancias se calculan sobre la forma compacta por bloques de filas de la
+# referencia (nunca se arma una copia float32 completa): la parte numérica con
+# ||x||² - 2x·r + ||r||² y la categórica con una tabla de (x - nivel)² por byte.
+
+import hashlib
+
+import numpy as np
+
+STORAGE_MODES = ('float32', 'int8')
+
+
+def source_fingerprint(knn):
+    """Huella del KNeighborsClassifier de origen (referencia, etiquetas y k)"""
+    digest = hashlib.sha1(np.ascontiguousarray(knn._fit_X).tobytes())
+    digest.update(np.ascontiguousarray(knn._y).tobytes())
+    digest.update(repr((list(knn.classes_), knn.n_neighbors)).encode())
+    return digest.hexdigest()
+
+
+class CompactKNN:
+    """KNN (euclidiano, pesos uniformes) sobre un conjunto de referencia compacto"""
+
+    def __init__(self, storage='float32', n_neighbors=5, pack_categoricals=True,
+                 max_levels=16, batch_size=256, tile_size=4096):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"storage debe ser uno de {STORAGE_MODES}, no '{storage}'")
+        self.storage = storage
+        self.n_neighbors = n_neighbors
+        self.pack_categoricals = pack_categoricals
+        self.max_levels = max_levels
+        self.batch_size = batch_size
+        self.tile_size = tile_size
+
+    @classmethod
+    def from_estimator(cls, knn, storage='float32', **kwargs):
+        """Construir la versión compacta a partir de un KNeighborsClassifier entrenado"""
+        if knn.effective_metric_ != 'euclidean' or knn.weights != 'uniform':
+            raise ValueError("Solo se soporta KNN euclidiano con pesos uniformes")
+        compact = cls(storage=storage, n_neighbors=knn.n_neighbors, **kwargs)
+        compact.fit(knn._fit_X, knn.classes_[knn._y])
+        # para detectar un models/knn_<storage>.pkl viejo si se reentrena el KNN
+        compact.source_fingerprint_ = source_fingerprint(knn)
+        return compact
+
+    def fit(self, X, y):
+        """Comprimir la matriz de referencia X (ya escalada) y guardar las etiquetas"""
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_, y_idx = np.unique(np.asarray(y), return_inverse=True)
+        self._y = y_idx.astype(np.min_scalar_type(len(self.classes_)))
+        self.n_features_in_ = X.shape[1]
+        self.n_samples_fit_ = X.shape[0]
+
+        # columnas categóricas: pocos valores distintos -> código + tabla de niveles
+        # (como mucho 256 niveles para que el código quepa en un byte)
+        self.cat_cols_, self.levels_ = [], []
+        if self.pack_categoricals:
+            for j in range(X.shape[1]):
+                levels = np.unique(X[:, j])
+                if len(levels) <= min(self.max_levels, 256):
+                    self.cat_cols_.append(j)
+                    self.levels_.append(levels)
+        self.num_cols_ = [j for j in range(X.shape[1]) if j not in self.cat_cols_]
+
+        self._pack(X)
+        self._quantize(X[:, self.num_cols_])
+        return self
+
+    def _pack(self, X):
+        # cada columna ocupa los bits mínimos para sus niveles y ninguna cruza el
+        # límite de un byte: así cada byte se puede resolver con una sola tabla
+        self.bit_fields_ = []
+        byte, shift = 0, 0
+        for levels in self.levels_:
+            bits = max(1, int(np.ceil(np.log2(len(levels)))))
+            if shift + bits > 8:
+                byte, shift = byte + 1, 0
+            self.bit_fields_.append((byte, shift, (1 << bits) - 1))
+            shift += bits
+
+        n_bytes = byte + 1 if self.cat_cols_ else 0
+        self.packed_ = np.zeros((X.shape[0], n_bytes), dtype=np.uint8)
+        for j, levels, (byte, shift, _) in zip(self.cat_cols_, self.levels_, self.bit_fields_):
+            codes = np.searchsorted(levels, X[:, j]).astype(np.uint8)
+            self.packed_[:, byte] |= codes << np.uint8(shift)
+        self.levels_ = [levels.astype(np.float32) for levels in self.levels_]
+
+    def _quantize(self, X_num):
+        # x ≈ offset + scale * q ; en float32 offset=0 y scale=1
+        if self.storage == 'float32':
+            self.offset_ = np.zeros(X_num.shape[1], dtype=np.float32)
+            self.scale_ = np.ones(X_num.shape[1], dtype=np.float32)
+            self.ref_ = X_num.astype(np.float32)
+        else:
+            lo, hi = X_num.min(axis=0), X_num.max(axis=0)
+            self.offset_ = ((hi + lo) / 2).astype(np.float32)
+            self.scale_ = np.where(hi > lo, (hi - lo) / 254, 1.0).astype(np.float32)
+            q = np.rint((X_num - self.offset_) / self.scale_)
+            self.ref_ = np.clip(q, -127, 127).astype(np.int8)
+        # norma de la parte numérica reconstruida (q*escala) de cada fila, por bloques
+        self.ref_norms_ = np.empty(self.n_samples_fit_, dtype=np.float32)
+        for start in range(0, self.n_samples_fit_, self.tile_size):
+            part = self.ref_[start:start + self.tile_size].astype(np.float32) * self.scale_
+            self.ref_norms_[start:start + len(part)] = np.einsum('ij,ij->i', part, part)
+
+    def _byte_tables(self, X):
+        """Por cada byte empaquetado, tabla (256 × consultas) con la suma de (x_j - nivel)²
+        de las columnas que viven en ese byte, para cada valor posible del byte"""
+        values = np.arange(256, dtype=np.uint8)
+        tables = np.zeros((self.packed_.shape[1], 256, len(X)), dtype=np.float32)
+        for j, levels, (byte, shift, mask) in zip(self.cat_cols_, self.levels_, self.bit_fields_):
+            codes = (values >> np.uint8(shift)) & np.uint8(mask)
+            level = levels[np.minimum(codes, len(levels) - 1)]
+            tables[byte] += (level[:, None] - X[None, :, j]) ** 2
+        return tables
+
+    def kneighbors(self, X, n_neighbors=None):
+        """Distancias e índices de los k vecinos más cercanos, igual que sklearn"""
+        k = n_neighbors or self.n_neighbors
+        # mismo error que sklearn: con menos filas que k no hay k vecinos que devolver
+        if k > self.n_samples_fit_:
+            raise ValueError(f"Expected n_neighbors <= n_samples_fit, but n_neighbors = {k}, "
+                             f"n_samples_fit = {self.n_samples_fit_}")
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        dist = np.empty((X.shape[0], k), dtype=np.float32)
+        ind = np.empty((X.shape[0], k), dtype=np.intp)
+        for start in range(0, X.shape[0], self.batch_size):
+            block = X[start:start + self.batch_size]
+            # numéricas: -2(x - offset)·escala contra q crudo; categóricas: tablas por byte
+            z = block[:, self.num_cols_] - self.offset_
+            weights = (-2 * z * self.scale_).T
+            z_norms = np.einsum('ij,ij->i', z, z)
+            tables = self._byte_tables(block)
+
+            # mejores k por consulta hasta ahora, ordenados de menor a mayor distancia
+            best_d2 = np.full((len(block), k), np.inf, dtype=np.float32)
+            best_ind = np.zeros((len(block), k), dtype=np.intp)
+            queries = np.repeat(np.arange(len(block)), k)
+            # la referencia se recorre por bloques de tile_size filas: la memoria extra
+            # queda acotada a tile_size × batch_size y nunca se decodifica completa
+            for tile_start in range(0, self.n_samples_fit_, self.tile_size):
+                tile_stop = min(tile_start + self.tile_size, self.n_samples_fit_)
+                d2 = self.ref_[tile_start:tile_stop].astype(np.float32) @ weights
+                d2 += self.ref_norms_[tile_start:tile_stop, None]
+                d2 += z_norms[None, :]
+                packed = self.packed_[tile_start:tile_stop]
+                for byte in range(packed.shape[1]):
+                    d2 += tables[byte][packed[:, byte]]
+
+                # solo las filas que mejoran la k-ésima distancia actual son candidatas;
+                # en el primer bloque la cota es la k-ésima distancia de 1 de cada 8 filas
+                # (siempre >= la real, y mucho más barata que particionar todo el bloque)
+                bound = best_d2[:, -1]
+                if len(d2) >= k and np.isinf(bound).any():
+                    sample = d2[::8] if len(d2) >= 8 * k else d2
+                    sample = np.ascontiguousarray(sample.T)
+                    bound = np.minimum(bound, np.partition(sample, k - 1, axis=1)[:, k - 1])
+                rows, cols = np.divmod(np.flatnonzero(d2 <= bound[None, :]), len(block))
+                if not len(rows):
+                    continue
+                cand_q = np.concatenate([queries, cols])
+                cand_d2 = np.concatenate([best_d2.ravel(), d2[rows, cols]])
+                cand_ind = np.concatenate([best_ind.ravel(), rows + tile_start])
+                order = np.lexsort((cand_ind, cand_d2, cand_q))
+                # cada consulta tiene al menos k candidatos: nos quedamos con los k primeros
+                first = np.searchsorted(cand_q[order], np.arange(len(block)))
+                take = order[first[:, None] + np.arange(k)]
+                best_d2, best_ind = cand_d2[take], cand_ind[take]
+
+            ind[start:start + len(block)] = best_ind
+            dist[start:start + len(block)] = np.sqrt(np.maximum(best_d2, 0))
+        return dist, ind
+
+    def predict_proba(self, X):
+        _, ind = self.kneighbors(X)
+        votes = self._y[ind]
+        proba = np.zeros((len(ind), len(self.classes_)))
+        for c in range(len(self.classes_)):
+            proba[:, c] = (votes == c).mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por el conjunto de referencia compacto"""
+        return (self.ref_.nbytes + self.ref_norms_.nbytes + self.packed_.nbytes
+                + self._y.nbytes + sum(levels.nbytes for levels in self.levels_))
@@ -0,0 +1,145 @@
+# evaluación de modelos candidatos sin tocar la latencia de las peticiones
+# - ruteo A/B con pesos entre versiones (live / candidate)
+# - modo shadow: la candidata puntúa una fracción del tráfico en un pool de
+#   hilos en segundo plano y se guardan sus resultados junto a los del modelo live
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import hashlib
+import math
+import random
+import threading
+import time
+
+import numpy as np
+
+
+def parse_weights(text):
+    """'live=90,candidate=10' -> {'live': 0.9, 'candidate': 0.1}
+
+    Un peso negativo o no finito es un error (ValueError): un typo nunca debe
+    terminar mandando todo el tráfico a la candidata.
+    """
+    weights = {}
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        name, _, value = part.partition('=')
+        weight = float(value)
+        if not math.isfinite(weight) or weight < 0:
+            raise ValueError(f"peso inválido para '{name.strip()}': {value}")
+        weights[name.strip()] = weight
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items()} if total > 0 else {}
+
+
+class ModelVersions:
+    """Versiones de un modelo con ruteo A/B ponderado y evaluación shadow de la candidata"""
+
+    def __init__(self, name, live, score_fn, candidate=None, weights=None, shadow_fraction=0.0,
+                 workers=2, max_pending=256, max_records=10000):
+        self.name = name
+        self.versions = {'live': live}
+        if candidate is not None:
+            self.versions['candidate'] = candidate
+        # score_fn(modelo, X) -> (predicciones, probabilidades) para un lote ya escalado
+        self.score_fn = score_fn
+        self.weights = self._normalize(weights or {'live': 1.0})
+        self.shadow_fraction = shadow_fraction if candidate is not None else 0.0
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'shadow-{name}')
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=max_records)
+        self._dropped = 0
+        self._errors = 0
+        self._served = {v: 0 for v in self.versions}
+
+    def _normalize(self, weights):
+        """Quedarse con los pesos de versiones cargadas y reescalarlos para que sumen 1"""
+        unknown = [v for v in weights if v not in self.versions]
+        if unknown:
+            print(f"[AVISO] Pesos A/B de {self.name}: versiones no cargadas {unknown}, se ignoran")
+        weights = {v: w for v, w in weights.items() if v in self.versions and w > 0}
+        total = sum(weights.values())
+        if total <= 0:
+            return {'live': 1.0}
+        return {v: w / total for v, w in weights.items()}
+
+    def route(self, key=None):
+        """Elegir versión según los pesos; con key (p. ej. customerID) la elección es estable"""
+        if len(self.weights) <= 1:
+            version = next(iter(self.weights), 'live')
+        else:
+            if key is None:
+                u = random.random()
+            else:
+                digest = hashlib.md5(f'{self.name}:{key}'.encode()).digest()
+                u = int.from_bytes(digest[:8], 'big') / 2 ** 64
+            version = list(self.weights)[-1]
+            for name, weight in self.weights.items():
+                if u < weight:
+                    version = name
+                    break
+                u -= weight
+        with self._lock:
+            self._served[version] += 1
+        return version, self.versions[version]
+
+    def shadow(self, version, X, live_pred, live_proba, live_ms):
+        """Encolar la candidata sobre X si toca; nunca bloquea la petición"""
+        if version != 'live' or self.shadow_fraction <= 0 or random.random() >= self.shadow_fraction:
+            return False
+        # si el pool va atrasado descartamos en vez de acumular trabajo
+        if not self._pending.acquire(blocking=False):
+            with self._lock:
+                self._dropped += 1
+            return False
+        self._executor.submit(self._score_candidate, X.copy(), np.asarray(live_pred),
+                              np.asarray(live_proba, dtype=float), live_ms)
+        return True
+
+    def _score_candidate(self, X, live_pred, live_proba, live_ms):
+        try:
+            start = time.perf_counter()
+            pred, proba = self.score_fn(self.versions['candidate'], X)
+            candidate_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._records.append((
+                    int(np.sum(np.asarray(pred) == live_pred)),
+                    len(X),
+                    float(np.sum(np.abs(np.asarray(proba, dtype=float) - live_proba))),
+                    float(np.max(np.abs(np.asarray(proba, dtype=float) - live_proba))),
+                    live_ms,
+                    candidate_ms,
+                ))
+        except Exception:
+            with self._lock:
+                self._errors += 1
+        finally:
+            self._pending.release()
+
+    def stats(self):
+        """Resumen de la comparación shadow y del tráfico servido por versión"""
+        with self._lock:
+            records = np.array(self._records, dtype=float).reshape(-1, 6)
+            summary = {
+                'versions': list(self.versions),
+                'weights': self.weights,
+                'shadow_fraction': self.shadow_fraction,
+                'served': dict(self._served),
+                'shadow_requests': len(records),
+                'shadow_dropped': self._dropped,
+                'shadow_errors': self._errors,
+            }
+        if len(records):
+            rows = records[:, 1].sum()
+            summary.update({
+                'shadow_rows': int(rows),
+                'agreement_rate': float(records[:, 0].sum() / rows),
+                'mean_abs_probability_delta': float(records[:, 2].sum() / rows),
+                'max_abs_probability_delta': float(records[:, 3].max()),
+                'live_latency_ms': {'p50': float(np.percentile(records[:, 4], 50)),
+                                    'p95': float(np.percentile(records[:, 4], 95))},
+                'candidate_latency_ms': {'p50': float(np.percentile(records[:, 5], 50)),
+                                         'p95': float(np.percentile(records[:, 5], 95))},
+            })
+        return summary
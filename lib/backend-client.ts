@@ -0,0 +1,191 @@
+// cliente para reenviar las predicciones de las rutas de Next.js al backend Flask
+// usa un pool de conexiones keep-alive (no abre un TCP nuevo por llamada),
+// junta peticiones idénticas que están en vuelo y respeta un presupuesto de tiempo
+
+import http from "node:http"
+import https from "node:https"
+
+const BACKEND_URL = new URL(process.env.ML_BACKEND_URL ?? "http://127.0.0.1:5000")
+const TIMEOUT_MS = Number(process.env.ML_BACKEND_TIMEOUT_MS ?? 3000)
+const MAX_SOCKETS = Number(process.env.ML_BACKEND_MAX_SOCKETS ?? 16)
+
+// error con el status que devolvió flask (o 504/502 si no hubo respuesta)
+export class BackendError extends Error {
+  status: number
+
+  constructor(message: string, status: number) {
+    super(message)
+    this.name = "BackendError"
+    this.status = status
+  }
+}
+
+type Pool = {
+  agent: http.Agent
+  inFlight: Map<string, Promise<unknown>>
+}
+
+// guardo el pool en globalThis para que el hot reload de next no cree uno nuevo en cada cambio
+const globalPool = globalThis as typeof globalThis & { __mlBackendPool?: Pool }
+
+function getPool(): Pool {
+  if (!globalPool.__mlBackendPool) {
+    const options = { keepAlive: true, maxSockets: MAX_SOCKETS, maxFreeSockets: MAX_SOCKETS }
+    globalPool.__mlBackendPool = {
+      agent: BACKEND_URL.protocol === "https:" ? new https.Agent(options) : new http.Agent(options),
+      inFlight: new Map(),
+    }
+  }
+  return globalPool.__mlBackendPool
+}
+
+// JSON con las llaves ordenadas, así {a, b} y {b, a} cuentan como la misma petición
+function stableStringify(value: unknown): string {
+  if (Array.isArray(value)) return `[${value.map(stableStringify).join(",")}]`
+  if (value && typeof value === "object") {
+    const entries = Object.keys(value as Record<string, unknown>)
+      .sort()
+      .map((key) => `${JSON.stringify(key)}:${stableStringify((value as Record<string, unknown>)[key])}`)
+    return `{${entries.join(",")}}`
+  }
+  return JSON.stringify(value)
+}
+
+// una sola petición HTTP por el pool, cortada cuando se acaba el tiempo que queda
+function send(path: string, payload: string, timeoutMs: number): Promise<unknown> {
+  const client = BACKEND_URL.protocol === "https:" ? https : http
+
+  return new Promise((resolve, reject) => {
+    const req = client.request(
+      new URL(path, BACKEND_URL),
+      {
+        method: "POST",
+        agent: getPool().agent,
+        headers: { "Content-Type": "application/json", "Content-Length": Buffer.byteLength(payload) },
+      },
+      (res) => {
+        const chunks: Buffer[] = []
+        res.on("data", (chunk: Buffer) => chunks.push(chunk))
+        res.on("end", () => {
+          clearTimeout(timer)
+          let data: any
+          try {
+            data = JSON.parse(Buffer.concat(chunks).toString("utf8"))
+          } catch {
+            return reject(new BackendError("Respuesta inválida del backend", 502))
+          }
+          const status = res.statusCode ?? 502
+          if (status >= 400 || data?.error) {
+            return reject(new BackendError(data?.error ?? `Backend respondió ${status}`, status >= 400 ? status : 502))
+          }
+          resolve(data)
+        })
+        res.on("error", reject)
+      },
+    )
+
+    const timer = setTimeout(() => {
+      req.destroy(new BackendError(`El backend no respondió en ${timeoutMs} ms`, 504))
+    }, timeoutMs)
+
+    req.on("error", (err) => {
+      clearTimeout(timer)
+      reject(err)
+    })
+    req.end(payload)
+  })
+}
+
+// un socket keep-alive que flask ya cerró falla con ECONNRESET al reutilizarlo,
+// en ese caso reintento una vez si todavía queda presupuesto
+function isStaleSocket(err: unknown): boolean {
+  const code = (err as NodeJS.ErrnoException)?.code
+  return code === "ECONNRESET" || code === "EPIPE"
+}
+
+// errores de red sin status -> BackendError 502 para que la ruta no responda 500
+function toBackendError(err: unknown): BackendError {
+  if (err instanceof BackendError) return err
+  return new BackendError(`No se puede conectar con el backend: ${(err as Error).message}`, 502)
+}
+
+async function sendWithBudget(path: string, payload: string, timeoutMs: number): Promise<unknown> {
+  const deadline = Date.now() + timeoutMs
+  try {
+    return await send(path, payload, timeoutMs)
+  } catch (err) {
+    const remaining = deadline - Date.now()
+    if (!isStaleSocket(err) || remaining <= 0) throw toBackendError(err)
+    try {
+      return await send(path, payload, remaining)
+    } catch (retryErr) {
+      throw toBackendError(retryErr)
+    }
+  }
+}
+
+// POST al backend; si ya hay una petición idéntica en vuelo se comparte su resultado
+export function postBackend<T>(path: string, body: unknown, timeoutMs: number = TIMEOUT_MS): Promise<T> {
+  const payload = stableStringify(body)
+  const key = `${path}\n${payload}`
+  const { inFlight } = getPool()
+
+  const pending = inFlight.get(key)
+  if (pending) return pending as Promise<T>
+
+  const request = sendWithBudget(path, payload, timeoutMs).finally(() => inFlight.delete(key))
+  inFlight.set(key, request)
+  return request as Promise<T>
+}
+
+// ================================
+//   RESPUESTAS DE FLASK -> FRONTEND
+// ================================
+
+type FlaskChurn = { prediction: number; probability: number }
+type FlaskKnn = FlaskChurn & { neighbors: { index: number; class: number; distance: number }[] }
+type FlaskCluster = {
+  cluster: number
+  profile_description: string
+  explanation?: { profile: Record<string, number | null> }
+}
+
+function churnFields(prediction: number, probability: number) {
+  return {
+    success: true,
+    prediction: prediction === 1 ? "Sí" : "No",
+    probability: probability.toFixed(4),
+    confidence: Math.abs(probability - 0.5) * 2,
+  }
+}
+
+export async function predictLogistic(body: unknown) {
+  const data = await postBackend<FlaskChurn>("/api/predict-churn-lr", body)
+  return churnFields(data.prediction, data.probability)
+}
+
+export async function predictKnn(body: unknown) {
+  const data = await postBackend<FlaskKnn>("/api/predict-churn-knn", body)
+  const nearest = data.neighbors[0]
+  return {
+    ...churnFields(data.prediction, data.probability),
+    nearestNeighbors: data.neighbors.map((n) => ({ index: n.index, class: n.class })),
+    distance: nearest ? nearest.distance.toFixed(2) : null,
+  }
+}
+
+export async function predictKmeans(body: unknown) {
+  // pido la explicación para poder devolver el perfil medio del cluster
+  const data = await postBackend<FlaskCluster>("/api/predict-cluster?explain=1", body)
+  const profile = data.explanation?.profile ?? {}
+  return {
+    success: true,
+    cluster: data.cluster,
+    description: data.profile_description,
+    profile: {
+      balance: profile.BALANCE ?? null,
+      purchases: profile.PURCHASES ?? null,
+      creditLimit: profile.CREDIT_LIMIT ?? null,
+    },
+  }
+}
@@ -0,0 +1,139 @@
+# motor de evaluación para los entrenamientos
+# ordena los scores una sola vez y con sumas acumuladas saca, para todos los
+# umbrales a la vez: matriz de confusión, precision/recall/F1, curvas ROC y PR
+# y AUC. también intervalos de confianza por bootstrap (en paralelo) sin
+# volver a ordenar: cada réplica es solo un vector de pesos sobre el mismo orden.
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import os
+
+CI_METRICS = ['accuracy', 'precision', 'recall', 'f1', 'auc', 'average_precision']
+
+
+def _divide(num, den):
+    """num/den con 0 donde den es 0 (como zero_division=0 en sklearn)"""
+    num, den = np.asarray(num, dtype=float), np.asarray(den, dtype=float)
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den != 0)
+
+
+def _cumulative(y_sorted, scores_sorted, weights=None):
+    """TP y FP acumulados en cada umbral distinto (scores de mayor a menor)"""
+    pos = y_sorted if weights is None else y_sorted * weights
+    neg = (1 - y_sorted) if weights is None else (1 - y_sorted) * weights
+    # último índice de cada grupo de scores empatados
+    last = np.r_[np.flatnonzero(np.diff(scores_sorted)), len(scores_sorted) - 1]
+    return np.cumsum(pos)[last], np.cumsum(neg)[last], scores_sorted[last]
+
+
+def _metrics(tps, fps, thresholds, threshold):
+    """Métricas en el umbral pedido y AUC de ROC/PR a partir de los acumulados"""
+    P, N = tps[-1], fps[-1]
+
+    # predicción positiva si score >= threshold
+    k = np.searchsorted(-thresholds, -threshold, side='right') - 1
+    tp, fp = (tps[k], fps[k]) if k >= 0 else (0, 0)
+    fn, tn = P - tp, N - fp
+
+    precision = float(_divide(tp, tp + fp))
+    recall = float(_divide(tp, P))
+    fpr, tpr = np.r_[0, _divide(fps, N)], np.r_[0, _divide(tps, P)]
+    recall_curve, precision_curve = _divide(tps, P), _divide(tps, tps + fps)
+
+    return {
+        'threshold': threshold,
+        'accuracy': float(_divide(tp + tn, P + N)),
+        'precision': precision,
+        'recall': recall,
+        'f1': float(_divide(2 * precision * recall, precision + recall)),
+        # regla del trapecio sobre la ROC
+        'auc': float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)) if P and N else float('nan'),
+        'average_precision': float(np.sum(np.diff(np.r_[0, recall_curve]) * precision_curve)),
+        'confusion_matrix': np.array([[tn, fp], [fn, tp]]),
+    }
+
+
+def _bootstrap(y_sorted, scores_sorted, order, threshold, seeds):
+    """Métricas de varias réplicas bootstrap; los pesos se reordenan con el orden ya calculado"""
+    n = len(order)
+    rows = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        weights = np.bincount(rng.integers(0, n, n), minlength=n)[order]
+        tps, fps, thresholds = _cumulative(y_sorted, scores_sorted, weights)
+        m = _metrics(tps, fps, thresholds, threshold)
+        rows.append([m[name] for name in CI_METRICS])
+    return rows
+
+
+def evaluate(y_true, scores, threshold=0.5, n_bootstrap=0, confidence=0.95, n_jobs=None, random_state=42):
+    """Evaluar un clasificador binario en todos los umbrales con un solo ordenamiento
+
+    Devuelve un dict con las métricas en `threshold` (score >= threshold es positivo),
+    la curva ROC (fpr, tpr, umbrales), la curva PR (precision, recall, umbrales), la
+    tabla `sweep` con todas las métricas por umbral, el umbral de mejor F1 y, si
+    n_bootstrap > 0, intervalos de confianza en `ci`.
+    """
+    y_true = np.asarray(y_true).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+
+    order = np.argsort(-scores, kind='mergesort')
+    y_sorted, scores_sorted = y_true[order], scores[order]
+    tps, fps, thresholds = _cumulative(y_sorted, scores_sorted)
+    P, N = tps[-1], fps[-1]
+
+    result = _metrics(tps, fps, thresholds, threshold)
+
+    # tabla completa: una fila por umbral distinto
+    precision = _divide(tps, tps + fps)
+    recall = _divide(tps, P)
+    f1 = _divide(2 * precision * recall, precision + recall)
+    sweep = pd.DataFrame({
+        'threshold': thresholds,
+        'tp': tps, 'fp': fps, 'fn': P - tps, 'tn': N - fps,
+        'accuracy': _divide(tps + N - fps, P + N),
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'fpr': _divide(fps, N),
+    })
+
+    result.update({
+        'roc': (np.r_[0, _divide(fps, N)], np.r_[0, recall], np.r_[np.inf, thresholds]),
+        'pr': (precision, recall, thresholds),
+        'sweep': sweep,
+        'best_threshold': float(thresholds[np.argmax(f1)]),
+        'best_f1': float(f1.max()),
+    })
+
+    if n_bootstrap > 0:
+        # cada réplica tiene su propia semilla: el resultado no depende de cuántos hilos se usen
+        seeds = np.random.SeedSequence(random_state).spawn(n_bootstrap)
+        n_jobs = n_jobs or min(os.cpu_count() or 1, 8)
+        blocks = [seeds[i::n_jobs] for i in range(n_jobs)]
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            parts = pool.map(lambda block: _bootstrap(y_sorted, scores_sorted, order, threshold, block), blocks)
+            samples = np.array([row for part in parts for row in part])
+        alpha = (1 - confidence) / 2
+        low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+        result['ci'] = {name: (float(lo), float(hi)) for name, lo, hi in zip(CI_METRICS, low, high)}
+        result['confidence'] = confidence
+
+    return result
+
+
+def format_report(ev):
+    """Texto con las métricas (y sus intervalos si hay bootstrap) para consola y resumen"""
+    names = [('Accuracy', 'accuracy'), ('Precision', 'precision'), ('Recall', 'recall'),
+             ('F1-Score', 'f1'), ('AUC-ROC', 'auc'), ('Average Precision', 'average_precision')]
+    lines = [f"Umbral: {ev['threshold']:.2f}"]
+    for label, key in names:
+        line = f"{label}: {ev[key]:.4f}"
+        if 'ci' in ev:
+            lo, hi = ev['ci'][key]
+            line += f"  (IC {ev['confidence']:.0%}: {lo:.4f} - {hi:.4f})"
+        lines.append(line)
+    lines.append(f"Mejor umbral (F1): {ev['best_threshold']:.4f} -> F1 {ev['best_f1']:.4f}")
+    lines.append(f"\nConfusion Matrix:\n{ev['confusion_matrix']}")
+    return "\n".join(lines)
@@ -6,14 +6,15 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import (
-    roc_curve, auc, confusion_matrix, accuracy_score,
-    precision_score, recall_score, f1_score, roc_auc_score
-)
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pickle
 import os
+import sys
+
+# añadimos la ruta del archivo para poder importar evaluation.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from evaluation import evaluate, format_report
 
 # mensaje inicial del entrenamiento
 print("[ENTRENANDO] K-Nearest Neighbors...")
@@ -90,27 +91,19 @@ knn = KNeighborsClassifier(n_neighbors=5)
 knn.fit(X_train_scaled, y_train)
 
 # Predicciones
-y_pred_knn = knn.predict(X_test_scaled)
 y_pred_proba_knn = knn.predict_proba(X_test_scaled)[:, 1]
 
 # ================================
 #   MÉTRICAS
 # ================================
 
-knn_accuracy = accuracy_score(y_test, y_pred_knn)
-knn_precision = precision_score(y_test, y_pred_knn)
-knn_recall = recall_score(y_test, y_pred_knn)
-knn_f1 = f1_score(y_test, y_pred_knn)
-knn_auc = roc_auc_score(y_test, y_pred_proba_knn)
-knn_cm = confusion_matrix(y_test, y_pred_knn)
+# un solo ordenamiento de los scores da todas las métricas y todos los umbrales
+knn_eval = evaluate(y_test, y_pred_proba_knn, threshold=0.5, n_bootstrap=200)
+knn_auc = knn_eval['auc']
+knn_cm = knn_eval['confusion_matrix']
 
 print(f"\n[METRICAS] K-Nearest Neighbors:")
-print(f"Accuracy: {knn_accuracy:.4f}")
-print(f"Precision: {knn_precision:.4f}")
-print(f"Recall: {knn_recall:.4f}")
-print(f"F1-Score: {knn_f1:.4f}")
-print(f"AUC: {knn_auc:.4f}")
-print(f"Confusion Matrix:\n{knn_cm}")
+print(format_report(knn_eval))
 
 # ================================
 #   GUARDADO DE MODELOS
@@ -129,7 +122,7 @@ print("[GENERANDO] Gráficas...")
 fig, axes = plt.subplots(1, 2, figsize=(12, 4))
 
 # ROC Curve
-fpr_knn, tpr_knn, _ = roc_curve(y_test, y_pred_proba_knn)
+fpr_knn, tpr_knn, _ = knn_eval['roc']
 axes[0].plot(fpr_knn, tpr_knn, label=f'KNN (AUC={knn_auc:.3f})', lw=2, color='#10b981')
 axes[0].plot([0, 1], [0, 1], 'k--', lw=1)
 axes[0].set_xlabel('False Positive Rate')
@@ -154,11 +147,10 @@ print("[OK] Gráficas guardadas en models/knn_metrics.png")
 
 with open('models/knn_summary.txt', 'w') as f:
     f.write("=== TELCO CUSTOMER CHURN - K-NEAREST NEIGHBORS ===\n\n")
-    f.write(f"Accuracy: {knn_accuracy:.4f}\n")
-    f.write(f"Precision: {knn_precision:.4f}\n")
-    f.write(f"Recall: {knn_recall:.4f}\n")
-    f.write(f"F1-Score: {knn_f1:.4f}\n")
-    f.write(f"AUC-ROC: {knn_auc:.4f}\n")
-    f.write(f"\nConfusion Matrix:\n{knn_cm}\n")
+    f.write(format_report(knn_eval) + "\n")
+
+# tabla por umbral para elegir el punto de operación
+knn_eval['sweep'].to_csv('models/knn_thresholds.csv', index=False)
+print("[OK] Métricas por umbral guardadas en models/knn_thresholds.csv")
 
 print("\n[EXITO] Entrenamiento KNN completado!")
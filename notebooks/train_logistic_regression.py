@@ -6,10 +6,6 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (
-    roc_curve, auc, confusion_matrix, accuracy_score,
-    precision_score, recall_score, f1_score, roc_auc_score
-)
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pickle
@@ -18,6 +14,7 @@ import sys
 
 # añadimos la ruta del archivo para evitar errores en ejecuciones externas
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from evaluation import evaluate, format_report
 
 # se crean las carpetas necesarias por si no existen
 os.makedirs('models', exist_ok=True)
@@ -94,24 +91,16 @@ lr = LogisticRegression(max_iter=1000, random_state=42)
 lr.fit(X_train_scaled, y_train)
 
 # Predicciones
-y_pred_lr = lr.predict(X_test_scaled)
 y_pred_proba_lr = lr.predict_proba(X_test_scaled)[:, 1]
 
 # Métricas
-lr_accuracy = accuracy_score(y_test, y_pred_lr)
-lr_precision = precision_score(y_test, y_pred_lr)
-lr_recall = recall_score(y_test, y_pred_lr)
-lr_f1 = f1_score(y_test, y_pred_lr)
-lr_auc = roc_auc_score(y_test, y_pred_proba_lr)
-lr_cm = confusion_matrix(y_test, y_pred_lr)
+# un solo ordenamiento de los scores da todas las métricas y todos los umbrales
+lr_eval = evaluate(y_test, y_pred_proba_lr, threshold=0.5, n_bootstrap=200)
+lr_auc = lr_eval['auc']
+lr_cm = lr_eval['confusion_matrix']
 
 print(f"\n[METRICAS] Regresión Logística:")
-print(f"Accuracy: {lr_accuracy:.4f}")
-print(f"Precision: {lr_precision:.4f}")
-print(f"Recall: {lr_recall:.4f}")
-print(f"F1-Score: {lr_f1:.4f}")
-print(f"AUC: {lr_auc:.4f}")
-print(f"Confusion Matrix:\n{lr_cm}")
+print(format_report(lr_eval))
 
 # ======================================
 #          GUARDADO DEL MODELO
@@ -130,7 +119,7 @@ print("[GENERANDO] Gráficas...")
 fig, axes = plt.subplots(1, 2, figsize=(12, 4))
 
 # ROC Curve
-fpr_lr, tpr_lr, _ = roc_curve(y_test, y_pred_proba_lr)
+fpr_lr, tpr_lr, _ = lr_eval['roc']
 axes[0].plot(fpr_lr, tpr_lr, label=f'Logistic Regression (AUC={lr_auc:.3f})', lw=2, color='#3b82f6')
 axes[0].plot([0, 1], [0, 1], 'k--', lw=1)
 axes[0].set_xlabel('False Positive Rate')
@@ -155,11 +144,10 @@ print("[OK] Gráficas guardadas en models/logistic_regression_metrics.png")
 
 with open('models/logistic_regression_summary.txt', 'w') as f:
     f.write("=== TELCO CUSTOMER CHURN - REGRESIÓN LOGÍSTICA ===\n\n")
-    f.write(f"Accuracy: {lr_accuracy:.4f}\n")
-    f.write(f"Precision: {lr_precision:.4f}\n")
-    f.write(f"Recall: {lr_recall:.4f}\n")
-    f.write(f"F1-Score: {lr_f1:.4f}\n")
-    f.write(f"AUC-ROC: {lr_auc:.4f}\n")
-    f.write(f"\nConfusion Matrix:\n{lr_cm}\n")
+    f.write(format_report(lr_eval) + "\n")
+
+# tabla por umbral para elegir el punto de operación
+lr_eval['sweep'].to_csv('models/logistic_regression_thresholds.csv', index=False)
+print("[OK] Métricas por umbral guardadas en models/logistic_regression_thresholds.csv")
 
 print("\n[EXITO] Entrenamiento Logistic Regression completado!")
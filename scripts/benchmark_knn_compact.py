@@ -0,0 +1,108 @@
+# script para comparar el KNN original (float64) contra las versiones compactas
+# mide memoria, accuracy, concordancia con el original y latencia
+# uso: python scripts/benchmark_knn_compact.py [--save]
+
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+import argparse
+import pickle
+import time
+import os
+import sys
+
+# el módulo vive en backend/ para que el servidor Flask lo use igual
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from knn_compact import CompactKNN, STORAGE_MODES
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--save', action='store_true',
+                    help='guardar models/knn_<storage>.pkl para cada variante')
+parser.add_argument('--repeats', type=int, default=200,
+                    help='repeticiones para medir la latencia de una fila')
+args = parser.parse_args()
+
+# ======================================
+#     MISMO SPLIT QUE train_knn.py
+# ======================================
+
+print("[INFO] Cargando dataset y modelos...")
+
+df = pd.read_csv('data/WA_Fn-UseC_-Telco-Customer-Churn.csv')
+df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+df = df.dropna(subset=['TotalCharges'])
+
+label_encoders = pickle.load(open('models/label_encoders.pkl', 'rb'))
+for col, le in label_encoders.items():
+    df[col] = le.transform(df[col])
+
+y = (df['Churn'] == 'Yes').astype(int)
+X = df.drop(['customerID', 'Churn'], axis=1)
+
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.2, random_state=42, stratify=y
+)
+
+scaler = pickle.load(open('models/scaler_knn.pkl', 'rb'))
+X_test_scaled = scaler.transform(X_test)
+knn = pickle.load(open('models/knn.pkl', 'rb'))
+
+
+def measure(model):
+    """Predicciones del test y latencias (fila única y lote completo) en ms"""
+    y_pred = model.predict(X_test_scaled)
+
+    single = []
+    for i in range(args.repeats):
+        row = X_test_scaled[i % len(X_test_scaled)][None, :]
+        start = time.perf_counter()
+        model.predict(row)
+        single.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict(X_test_scaled)
+    batch = (time.perf_counter() - start) * 1000
+    return y_pred, float(np.median(single)), batch
+
+
+# ======================================
+#              COMPARACIÓN
+# ======================================
+
+base_pred, base_single, base_batch = measure(knn)
+rows = [{
+    'storage': 'float64 (sklearn)',
+    'bytes': knn._fit_X.nbytes + knn._y.nbytes,
+    'accuracy': accuracy_score(y_test, base_pred),
+    'agreement': 1.0,
+    'single_ms': base_single,
+    'batch_ms': base_batch,
+}]
+
+for storage in STORAGE_MODES:
+    compact = CompactKNN.from_estimator(knn, storage=storage)
+    y_pred, single, batch = measure(compact)
+    rows.append({
+        'storage': f'{storage} + bits',
+        'bytes': compact.nbytes,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'agreement': float(np.mean(y_pred == base_pred)),
+        'single_ms': single,
+        'batch_ms': batch,
+    })
+    if args.save:
+        pickle.dump(compact, open(f'models/knn_{storage}.pkl', 'wb'))
+        print(f"[GUARDANDO] models/knn_{storage}.pkl")
+
+results = pd.DataFrame(rows).set_index('storage')
+print(f"\n[RESULTADOS] KNN compacto ({len(X_test_scaled)} filas de test, {knn.n_samples_fit_} de referencia):")
+print(results.to_string(float_format=lambda v: f"{v:.4f}"))
+
+with open('models/knn_compact_summary.txt', 'w') as f:
+    f.write("=== TELCO CUSTOMER CHURN - KNN COMPACTO ===\n\n")
+    f.write(f"Referencia: {knn.n_samples_fit_} filas, Test: {len(X_test_scaled)} filas\n\n")
+    f.write(results.to_string(float_format=lambda v: f"{v:.4f}"))
+    f.write("\n")
+
+print("\n[OK] Resumen guardado en models/knn_compact_summary.txt")
@@ -0,0 +1,220 @@
+# micro-benchmarks de los puntos calientes del backend
+# mide la codificación de filas JSON (encode_telco del backend), escalado,
+# predict de LR/KNN/K-Means, carga de modelos e import de backend/app.py,
+# con calentamiento y repeticiones
+#
+# uso:
+#   python scripts/benchmarks.py run [--output benchmarks/latest.json]
+#   python scripts/benchmarks.py compare benchmarks/baseline.json benchmarks/latest.json [--threshold 0.10]
+
+import pandas as pd
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+import argparse
+import datetime
+import json
+import pickle
+import platform
+import statistics
+import subprocess
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from knn_compact import CompactKNN, STORAGE_MODES
+from features import encode_telco
+
+BATCH_SIZES = [1, 64, 1024]
+KNN_TRAIN_SIZES = [1000, 4000, 16000]
+MODEL_FILES = ['logistic_regression.pkl', 'knn.pkl', 'kmeans.pkl', 'scaler_lr.pkl',
+               'scaler_knn.pkl', 'scaler_kmeans.pkl', 'label_encoders.pkl', 'cluster_profiles.pkl']
+
+
+def bench(fn, warmup=3, repeats=20, min_time=0.002):
+    """Tiempos en ms por llamada: calienta, calibra el número de llamadas y repite"""
+    for _ in range(warmup):
+        fn()
+
+    # como timeit: agrupamos llamadas hasta que cada repetición dure al menos min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number * 1000)
+    return summarize(times, number)
+
+
+def summarize(times, number=1):
+    times = sorted(times)
+    return {
+        'min_ms': times[0],
+        'median_ms': statistics.median(times),
+        'mean_ms': statistics.fmean(times),
+        'stdev_ms': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'p95_ms': times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))],
+        'repeats': len(times),
+        'number': number,
+    }
+
+
+def load_telco():
+    """Filas crudas (sin codificar) y etiqueta de churn del dataset Telco"""
+    df = pd.read_csv('data/WA_Fn-UseC_-Telco-Customer-Churn.csv')
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    df = df.dropna(subset=['TotalCharges'])
+    raw = df.drop(['customerID', 'Churn'], axis=1)
+    y = (df['Churn'] == 'Yes').astype(int).values
+    return raw, y
+
+
+def take(X, n):
+    """Lote de n filas, repitiendo el dataset si hace falta"""
+    reps = int(np.ceil(n / len(X)))
+    if isinstance(X, pd.DataFrame):
+        return pd.concat([X] * reps, ignore_index=True).iloc[:n]
+    return np.tile(X, (reps, 1))[:n]
+
+
+def run(args):
+    results = {}
+
+    def record(name, stats):
+        results[name] = stats
+        print(f"  {name:<48} mediana {stats['median_ms']:10.4f} ms  (p95 {stats['p95_ms']:.4f})")
+
+    kw = dict(warmup=args.warmup, repeats=args.repeats)
+
+    # ---------- carga de modelos ----------
+    print("[BENCH] Carga de modelos...")
+    for filename in MODEL_FILES:
+        path = os.path.join('models', filename)
+        if os.path.exists(path):
+            record(f'load/{filename}', bench(lambda: pickle.load(open(path, 'rb')), warmup=1, repeats=args.repeats))
+
+    # ---------- import de backend/app.py ----------
+    # cada medición es un proceso nuevo; se mide solo la ejecución del módulo (imports + carga de modelos)
+    # si app.py no logra cargar los modelos el proceso falla: no queremos medir un arranque roto
+    print("[BENCH] Import de backend/app.py...")
+    code = ("import sys, time, importlib.util; sys.path.insert(0, 'backend'); t = time.perf_counter(); "
+            "spec = importlib.util.spec_from_file_location('flask_app', 'backend/app.py'); "
+            "module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module); "
+            "elapsed = time.perf_counter() - t; "
+            "sys.exit('backend/app.py no cargó los modelos') if not module.models else print(elapsed)")
+    times = []
+    for _ in range(args.startup_repeats):
+        out = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stdout + out.stderr)
+            raise SystemExit("[ERROR] El import de backend/app.py falló, no se puede medir el arranque")
+        times.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    record('startup/import_app', summarize(times))
+
+    # ---------- componentes por tamaño de lote ----------
+    raw, y = load_telco()
+    label_encoders = pickle.load(open('models/label_encoders.pkl', 'rb'))
+    scaler_lr = pickle.load(open('models/scaler_lr.pkl', 'rb'))
+    features = list(scaler_lr.feature_names_in_)
+    # mismo camino que el backend: lista de filas dict -> matriz en el orden del scaler
+    X = encode_telco(raw.to_dict('records'), label_encoders, features)
+    scaler_knn = pickle.load(open('models/scaler_knn.pkl', 'rb'))
+    lr = pickle.load(open('models/logistic_regression.pkl', 'rb'))
+    kmeans = pickle.load(open('models/kmeans.pkl', 'rb'))
+    scaler_kmeans = pickle.load(open('models/scaler_kmeans.pkl', 'rb'))
+    cc = pd.read_csv('data/CC-GENERAL.csv')[list(scaler_kmeans.feature_names_in_)].fillna(0)
+
+    print("[BENCH] Componentes por tamaño de lote...")
+    for n in BATCH_SIZES:
+        rows_n, X_n = take(raw, n).to_dict('records'), take(X, n)
+        X_lr, X_knn = scaler_lr.transform(X_n), scaler_knn.transform(X_n)
+        X_cc = scaler_kmeans.transform(take(cc, n))
+        record(f'encode_telco/batch={n}', bench(lambda: encode_telco(rows_n, label_encoders, features), **kw))
+        record(f'scaler/batch={n}', bench(lambda: scaler_lr.transform(X_n), **kw))
+        record(f'lr_predict_proba/batch={n}', bench(lambda: lr.predict_proba(X_lr), **kw))
+        record(f'kmeans_predict/batch={n}', bench(lambda: kmeans.predict(X_cc), **kw))
+
+        # KNN según el tamaño del conjunto de referencia (se repite el train con ruido)
+        for size in KNN_TRAIN_SIZES:
+            rng = np.random.default_rng(42)
+            ref = take(scaler_knn.transform(X), size)
+            ref = ref + rng.normal(0, 1e-3, ref.shape) * (np.arange(len(ref)) >= len(X))[:, None]
+            knn = KNeighborsClassifier(n_neighbors=5).fit(ref, take(y[:, None], size).ravel())
+            record(f'knn_predict[float64]/train={size}/batch={n}', bench(lambda: knn.predict(X_knn), **kw))
+            for storage in STORAGE_MODES:
+                compact = CompactKNN.from_estimator(knn, storage=storage)
+                record(f'knn_predict[{storage}]/train={size}/batch={n}',
+                       bench(lambda: compact.predict(X_knn), **kw))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'warmup': args.warmup,
+            'repeats': args.repeats,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Resultados guardados en {args.output}")
+
+
+def compare(args):
+    """Comparar medianas contra el baseline; sale con código 1 si algo empeoró más del umbral"""
+    baseline = json.load(open(args.baseline))['results']
+    current = json.load(open(args.current))['results']
+
+    regressions = []
+    print(f"{'benchmark':<48} {'baseline':>11} {'actual':>11} {'cambio':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]['median_ms'], current[name]['median_ms']
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ''
+        if change > args.threshold:
+            regressions.append(name)
+            flag = '  <-- REGRESION'
+        print(f"{name:<48} {before:11.4f} {after:11.4f} {change:+8.1%}{flag}")
+
+    for name in sorted(set(baseline) - set(current)):
+        print(f"[AVISO] {name} no está en los resultados actuales")
+
+    if regressions:
+        print(f"\n[ERROR] {len(regressions)} benchmark(s) más lentos que el umbral de {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\n[OK] Sin regresiones por encima de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmarks del backend')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='ejecutar los benchmarks y guardar JSON')
+    run_parser.add_argument('--output', default='benchmarks/latest.json')
+    run_parser.add_argument('--warmup', type=int, default=3)
+    run_parser.add_argument('--repeats', type=int, default=20)
+    run_parser.add_argument('--startup-repeats', type=int, default=5)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser('compare', help='comparar contra un baseline guardado')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='empeoramiento relativo de la mediana permitido (0.10 = 10%%)')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
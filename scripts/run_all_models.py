@@ -31,3 +31,5 @@ print("\nModelos guardados en: models/")
 print("  - logistic_regression.pkl")
 print("  - knn.pkl")
 print("  - kmeans.pkl")
+print("\nMétricas (con IC bootstrap) en: models/*_summary.txt")
+print("Métricas por umbral en: models/*_thresholds.csv")
@@ -0,0 +1,162 @@
+# script para segmentar toda la base de tarjetas de crédito con el modelo k-means
+# lee el csv por bloques, asigna clusters de forma vectorizada y acumula por
+# cluster: cantidad, suma y suma de cuadrados (no guarda las filas en memoria)
+#
+# uso:
+#   python scripts/segment_customers.py                          # reporte completo de data/CC-GENERAL.csv
+#   python scripts/segment_customers.py --input nuevos.csv --update   # sumar solo filas nuevas al reporte
+
+import pandas as pd
+import numpy as np
+import argparse
+import datetime
+import hashlib
+import json
+import pickle
+import os
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--input', default='data/CC-GENERAL.csv')
+parser.add_argument('--report', default='models/segmentation_report.json')
+parser.add_argument('--chunksize', type=int, default=50000)
+parser.add_argument('--update', action='store_true',
+                    help='sumar al reporte existente; si el archivo ya se procesó, solo lee las filas nuevas')
+args = parser.parse_args()
+
+
+def prefix_hash(path, n_rows):
+    """sha1 del encabezado y las primeras n_rows líneas del archivo (sin el salto de línea)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for _ in range(n_rows + 1):
+            line = f.readline()
+            if not line:
+                break
+            digest.update(line.rstrip(b'\r\n') + b'\n')
+    return digest.hexdigest()
+
+
+# ======================================
+#              MODELO
+# ======================================
+
+kmeans = pickle.load(open('models/kmeans.pkl', 'rb'))
+scaler = pickle.load(open('models/scaler_kmeans.pkl', 'rb'))
+features = list(scaler.feature_names_in_)
+n_clusters, n_features = kmeans.cluster_centers_.shape
+
+# huella del modelo: un reporte solo se puede actualizar con el mismo k-means
+fingerprint = hashlib.sha1(kmeans.cluster_centers_.tobytes() + scaler.mean_.tobytes()).hexdigest()
+
+# las sumas se acumulan centradas en el centroide (en unidades originales) de cada cluster,
+# así la varianza sum(d²)/n - (sum(d)/n)² no pierde precisión con montos grandes
+shift = scaler.inverse_transform(kmeans.cluster_centers_)
+
+# ======================================
+#        REPORTE PREVIO (--update)
+# ======================================
+
+count = np.zeros(n_clusters, dtype=np.int64)
+sums = np.zeros((n_clusters, n_features))
+sumsq = np.zeros((n_clusters, n_features))
+sources = {}
+
+if args.update and os.path.exists(args.report):
+    previous = json.load(open(args.report))
+    if previous['model_fingerprint'] != fingerprint or previous['features'] != features:
+        raise ValueError("ERROR: El reporte se generó con otro modelo k-means. Ejecuta sin --update.")
+    count = np.array(previous['aggregates']['count'], dtype=np.int64)
+    sums = np.array(previous['aggregates']['sum'])
+    sumsq = np.array(previous['aggregates']['sumsq'])
+    sources = previous['sources']
+    print(f"[INFO] Actualizando reporte existente ({count.sum()} clientes)")
+
+# solo se saltan filas si el archivo sigue empezando igual que cuando se procesó;
+# un archivo nuevo con el mismo nombre se contaría a medias
+input_key = os.path.normpath(args.input)
+skip = 0
+if args.update and input_key in sources:
+    source = sources[input_key]
+    if not isinstance(source, dict) or prefix_hash(args.input, source['rows']) != source['prefix_sha1']:
+        raise ValueError(f"ERROR: {args.input} cambió desde que se sumó al reporte (las primeras filas no "
+                         f"coinciden). Renombra el archivo nuevo o ejecuta sin --update.")
+    skip = source['rows']
+    print(f"[INFO] {args.input} ya tiene {skip} filas procesadas, se leen solo las nuevas")
+
+# ======================================
+#        SEGMENTACIÓN POR BLOQUES
+# ======================================
+
+print(f"[INFO] Segmentando {args.input} en bloques de {args.chunksize} filas...")
+
+rows = 0
+reader = pd.read_csv(args.input, usecols=features, chunksize=args.chunksize,
+                     skiprows=range(1, skip + 1))
+for chunk in reader:
+    # sin filas nuevas (o csv con solo encabezado) no hay nada que sumar, pero el reporte se reescribe igual
+    if chunk.empty:
+        continue
+    X = chunk[features].fillna(0)
+    labels = kmeans.predict(scaler.transform(X))
+
+    # one-hot (n × k) para acumular todos los clusters con un producto de matrices
+    onehot = np.zeros((len(labels), n_clusters))
+    onehot[np.arange(len(labels)), labels] = 1
+    delta = X.to_numpy(dtype=float) - shift[labels]
+
+    count += onehot.sum(axis=0).astype(np.int64)
+    sums += onehot.T @ delta
+    sumsq += onehot.T @ (delta * delta)
+    rows += len(labels)
+
+sources[input_key] = {'rows': skip + rows, 'prefix_sha1': prefix_hash(args.input, skip + rows)}
+print(f"[INFO] Filas nuevas procesadas: {rows}")
+
+# ======================================
+#              REPORTE
+# ======================================
+
+safe = np.maximum(count, 1)[:, None]
+mean_delta = sums / safe
+means = shift + mean_delta
+variance = np.maximum(sumsq / safe - mean_delta ** 2, 0)
+# desviación muestral (n-1)
+std = np.sqrt(variance * (safe / np.maximum(safe - 1, 1)))
+
+clusters = []
+for c in range(n_clusters):
+    clusters.append({
+        'cluster': c,
+        'count': int(count[c]),
+        'share': float(count[c] / max(count.sum(), 1)),
+        'mean': dict(zip(features, means[c].tolist())) if count[c] else None,
+        'std': dict(zip(features, std[c].tolist())) if count[c] else None,
+    })
+
+report = {
+    'updated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    'model_fingerprint': fingerprint,
+    'features': features,
+    'total': int(count.sum()),
+    'clusters': clusters,
+    'sources': sources,
+    # acumulados crudos (centrados en el centroide) para poder seguir sumando con --update
+    'aggregates': {
+        'shift': shift.tolist(),
+        'count': count.tolist(),
+        'sum': sums.tolist(),
+        'sumsq': sumsq.tolist(),
+    },
+}
+
+os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+with open(args.report, 'w') as f:
+    json.dump(report, f, indent=2)
+
+# en consola solo las primeras columnas; el detalle completo queda en el JSON
+summary = pd.DataFrame(means[:, :3], columns=features[:3])
+summary.insert(0, 'porcentaje', np.round(100 * count / max(count.sum(), 1), 1))
+summary.insert(0, 'clientes', count)
+print(f"\n[RESULTADOS] Segmentación ({count.sum()} clientes):")
+print(summary.to_string())
+print(f"\n[OK] Reporte guardado en {args.report}")
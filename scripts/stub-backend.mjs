@@ -0,0 +1,86 @@
+// backend falso con las mismas rutas y formas de respuesta que backend/app.py
+// sirve para probar las rutas de next (pool keep-alive, coalescing, timeouts) sin flask ni modelos
+// uso: node scripts/stub-backend.mjs   (STUB_PORT=5000, STUB_DELAY_MS=0)
+
+import http from "node:http"
+
+const PORT = Number(process.env.STUB_PORT ?? 5000)
+const DELAY_MS = Number(process.env.STUB_DELAY_MS ?? 0)
+
+let connections = 0
+let requests = 0
+
+// respuesta determinista a partir del cuerpo, para que sea fácil comparar
+function score(body) {
+  const text = JSON.stringify(body)
+  let hash = 0
+  for (const ch of text) hash = (hash * 31 + ch.charCodeAt(0)) >>> 0
+  return (hash % 1000) / 1000
+}
+
+const routes = {
+  "/api/predict-churn-lr": (body) => {
+    const probability = score(body)
+    return { prediction: probability > 0.5 ? 1 : 0, probability }
+  },
+  "/api/predict-churn-knn": (body) => {
+    const probability = Math.round(score(body) * 5) / 5
+    const neighbors = [0, 1, 2, 3, 4].map((i) => ({
+      index: i * 97,
+      class: i < probability * 5 ? 1 : 0,
+      distance: 0.1 * (i + 1),
+    }))
+    return { prediction: probability > 0.5 ? 1 : 0, probability, neighbors }
+  },
+  "/api/predict-cluster": (body, explain) => {
+    const cluster = Math.floor(score(body) * 3)
+    const result = { cluster, profile_description: `Cluster ${cluster} (stub)` }
+    if (explain) {
+      result.explanation = {
+        distances: { 0: 1.0, 1: 2.0, 2: 3.0 },
+        profile: { BALANCE: 1000 * (cluster + 1), PURCHASES: 500 * (cluster + 1), CREDIT_LIMIT: 5000 * (cluster + 1) },
+        deltas: {},
+      }
+    }
+    return result
+  },
+}
+
+const server = http.createServer((req, res) => {
+  requests += 1
+  const url = new URL(req.url, `http://${req.headers.host}`)
+  const send = (status, data) => {
+    res.writeHead(status, { "Content-Type": "application/json" })
+    res.end(JSON.stringify(data))
+  }
+
+  if (url.pathname === "/health") {
+    return send(200, { status: "OK", models_loaded: true, connections, requests })
+  }
+
+  const handler = routes[url.pathname]
+  if (!handler || req.method !== "POST") {
+    return send(404, { error: "Ruta no encontrada" })
+  }
+
+  const chunks = []
+  req.on("data", (chunk) => chunks.push(chunk))
+  req.on("end", () => {
+    let body
+    try {
+      body = JSON.parse(Buffer.concat(chunks).toString("utf8"))
+    } catch {
+      return send(400, { error: "JSON inválido" })
+    }
+    const explain = ["1", "true", "yes"].includes((url.searchParams.get("explain") ?? "").toLowerCase())
+    setTimeout(() => send(200, handler(body, explain)), DELAY_MS)
+  })
+})
+
+server.on("connection", () => {
+  connections += 1
+})
+
+server.listen(PORT, () => {
+  console.log(`[INFO] Backend stub en http://localhost:${PORT} (retardo ${DELAY_MS} ms)`)
+})